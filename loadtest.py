@@ -0,0 +1,638 @@
+# loadtest.py
+"""
+Offline load harness for the bot in main.py.
+
+Runs the real `commands.Bot` with no Discord connection, no Postgres and no
+Reddit: synthetic (or replayed) `on_message` events are fed straight into the
+bot, every REST call discord.py makes is captured instead of sent, and the
+`asyncpg` / `aiohttp` names main.py uses are swapped for in-memory stand-ins.
+
+Examples:
+    python loadtest.py --rate 200 --duration 30
+    python loadtest.py --rate 50 --count 1000 --record trace.jsonl
+    python loadtest.py --replay trace.jsonl --speed 4 --tracemalloc
+    python loadtest.py --self-check
+
+The gateway stubbing leans on discord.py internals (`Client._connection`,
+`Client._async_setup_hook`, `HTTPClient.request`) and was checked against
+discord.py 2.7. Run --self-check after upgrading; it fails loudly if the
+stubbing stops capturing replies.
+
+Trace files are JSON lines: {"t": <seconds from start>, "author": "<name>",
+"content": "<message text>"}.
+"""
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter, deque
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Tuple
+
+import discord
+from discord.ext import commands
+
+import main
+from items import ALL_NAMES
+
+# Snowflakes only need to be unique and increasing for discord.py's caches.
+_snowflakes = itertools.count(1_100_000_000_000_000_000)
+
+
+def _now_iso() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def _user_payload(user_id: int, name: str, bot: bool = False) -> dict:
+    return {
+        "id": str(user_id),
+        "username": name,
+        "discriminator": "0",
+        "global_name": name,
+        "avatar": None,
+        "bot": bot,
+    }
+
+
+# -------------------------------------------------------------------
+# Stand-in database (replaces asyncpg for main.py)
+# -------------------------------------------------------------------
+class FakeConnection:
+    """Just enough of an asyncpg connection for the queries main.py runs."""
+
+    def __init__(self, db: "FakeDatabase"):
+        self._db = db
+
+    async def execute(self, query: str, *args) -> str:
+        await self._db.wait()
+        sql = " ".join(query.split()).upper()
+        if sql.startswith("CREATE TABLE"):
+            return "CREATE TABLE"
+        if sql.startswith("INSERT INTO BUILDS"):
+            champion, item_ids, author = args
+            self._db.rows.append(
+                {"champion": champion, "item_ids": item_ids, "author": author}
+            )
+            return "INSERT 0 1"
+        if sql.startswith("DELETE FROM BUILDS"):
+            champion, author = args
+            before = len(self._db.rows)
+            self._db.rows = [
+                r for r in self._db.rows
+                if not (r["champion"] == champion and r["author"] == author)
+            ]
+            return f"DELETE {before - len(self._db.rows)}"
+        raise NotImplementedError(f"FakeConnection cannot execute: {query!r}")
+
+    async def fetch(self, query: str, *args) -> List[dict]:
+        await self._db.wait()
+        sql = " ".join(query.split()).upper()
+        if sql.startswith("SELECT ITEM_IDS, AUTHOR FROM BUILDS"):
+            (champion,) = args
+            return [
+                {"item_ids": r["item_ids"], "author": r["author"]}
+                for r in self._db.rows
+                if r["champion"] == champion
+            ]
+        raise NotImplementedError(f"FakeConnection cannot fetch: {query!r}")
+
+    async def close(self) -> None:
+        pass
+
+
+class FakeDatabase:
+    """In-memory `builds` table with an optional simulated round-trip time."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.rows: List[dict] = []
+        self.connections = 0
+
+    async def wait(self) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def connect(self, dsn=None, **kwargs) -> FakeConnection:
+        self.connections += 1
+        await self.wait()
+        return FakeConnection(self)
+
+
+# -------------------------------------------------------------------
+# Stand-in HTTP client (replaces aiohttp for main.py)
+# -------------------------------------------------------------------
+def _reddit_listing(size: int = 50) -> dict:
+    children = []
+    for i in range(size):
+        children.append({
+            "data": {
+                "url": f"https://i.redd.it/loadtest{i}.png",
+                "over_18": i % 10 == 0,
+                "post_hint": "image" if i % 3 else "link",
+            }
+        })
+    return {"data": {"children": children}}
+
+
+class FakeResponse:
+    def __init__(self, status: int, payload: dict):
+        self.status = status
+        self._payload = payload
+
+    async def json(self) -> dict:
+        return self._payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+
+class FakeHTTP:
+    """Serves a canned Reddit listing to every GET main.py makes."""
+
+    def __init__(self, latency: float = 0.0, status: int = 200):
+        self.latency = latency
+        self.status = status
+        self.requests = 0
+        self._listing = _reddit_listing()
+
+    def ClientSession(self, *args, **kwargs) -> "FakeSession":
+        return FakeSession(self)
+
+
+class FakeSession:
+    def __init__(self, http: FakeHTTP):
+        self._http = http
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+    def get(self, url: str, **kwargs) -> "_PendingResponse":
+        self._http.requests += 1
+        return _PendingResponse(self._http)
+
+
+class _PendingResponse:
+    """Async context manager that waits out the simulated latency on enter."""
+
+    def __init__(self, http: FakeHTTP):
+        self._http = http
+
+    async def __aenter__(self) -> FakeResponse:
+        if self._http.latency:
+            await asyncio.sleep(self._http.latency)
+        return FakeResponse(self._http.status, self._http._listing)
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+
+# -------------------------------------------------------------------
+# Simulated gateway
+# -------------------------------------------------------------------
+class CommandFailed(Exception):
+    """The bot handled a message but the command errored or was not found."""
+
+
+class SimulatedGateway:
+    """
+    Drives a `commands.Bot` without a websocket or REST connection.
+
+    Incoming messages are built from raw payloads the same way the real
+    gateway does and handed to `bot.on_message`. Outgoing REST calls are
+    answered locally; the last `keep_sends` sent messages are kept in `sent`
+    so capturing output does not itself show up as memory growth.
+    """
+
+    def __init__(self, bot: discord.Client, keep_sends: int = 1000):
+        self.bot = bot
+        self.state = bot._connection
+        self.sent: deque = deque(maxlen=keep_sends)
+        self.send_count = 0
+        self._channels: Dict[str, discord.DMChannel] = {}
+        self._users: Dict[str, dict] = {}
+        self._contexts: Dict[int, commands.Context] = {}
+        self.failures: Counter = Counter()
+        self._bot_user = _user_payload(next(_snowflakes), "BuildBot", bot=True)
+
+    async def start(self, dispatch_ready: bool = True) -> None:
+        await self.bot._async_setup_hook()
+        self.bot.http.request = self._request
+        self.bot.invoke = self._wrap_invoke(self.bot.invoke)
+        # Having a listener also stops the default handler logging every failure.
+        self.bot.add_listener(self._on_command_error, "on_command_error")
+        self.state.user = discord.ClientUser(state=self.state, data=self._bot_user)
+        if dispatch_ready:
+            await self.bot.on_ready()
+
+    def _wrap_invoke(self, invoke):
+        # Command errors never propagate out of on_message, so keep the
+        # context around and check `command_failed` once it returns.
+        async def wrapped(ctx: commands.Context) -> None:
+            self._contexts[ctx.message.id] = ctx
+            await invoke(ctx)
+        return wrapped
+
+    async def _on_command_error(self, ctx: commands.Context, error: Exception) -> None:
+        if isinstance(error, commands.CommandInvokeError):
+            error = error.original
+        self.failures[type(error).__name__] += 1
+
+    async def _request(self, route, *, files=None, form=None, **kwargs):
+        if route.method == "POST" and route.path == "/channels/{channel_id}/messages":
+            content = (kwargs.get("json") or {}).get("content")
+            self.send_count += 1
+            self.sent.append((route.channel_id, content))
+            return {
+                "id": str(next(_snowflakes)),
+                "channel_id": str(route.channel_id),
+                "author": self._bot_user,
+                "content": content or "",
+                "timestamp": _now_iso(),
+                "edited_timestamp": None,
+                "tts": False,
+                "mention_everyone": False,
+                "mentions": [],
+                "mention_roles": [],
+                "attachments": [],
+                "embeds": [],
+                "pinned": False,
+                "type": 0,
+            }
+        return None
+
+    def _channel_for(self, author: str) -> discord.DMChannel:
+        channel = self._channels.get(author)
+        if channel is None:
+            user = _user_payload(next(_snowflakes), author)
+            self._users[author] = user
+            channel = discord.DMChannel(
+                me=self.state.user,
+                state=self.state,
+                data={"id": str(next(_snowflakes)), "type": 1, "recipients": [user]},
+            )
+            self._channels[author] = channel
+        return channel
+
+    def make_message(self, author: str, content: str) -> discord.Message:
+        channel = self._channel_for(author)
+        data = {
+            "id": str(next(_snowflakes)),
+            "channel_id": str(channel.id),
+            "author": self._users[author],
+            "content": content,
+            "timestamp": _now_iso(),
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": [],
+            "pinned": False,
+            "type": 0,
+        }
+        return discord.Message(state=self.state, channel=channel, data=data)
+
+    async def deliver(self, author: str, content: str,
+                      scheduled: Optional[float] = None) -> Tuple[float, float]:
+        """
+        Dispatch one message. Returns (latency, handler time) in seconds, where
+        latency runs from `scheduled` (a `time.perf_counter()` value, defaulting
+        to now) so time spent queued behind earlier messages is included.
+        Raises CommandFailed if the bot could not run the command.
+        """
+        message = self.make_message(author, content)
+        started = time.perf_counter()
+        await self.bot.on_message(message)
+        finished = time.perf_counter()
+        ctx = self._contexts.pop(message.id, None)
+        if ctx is not None and (
+            ctx.command_failed or (ctx.command is None and ctx.invoked_with)
+        ):
+            raise CommandFailed(content)
+        if scheduled is None:
+            scheduled = started
+        return finished - scheduled, finished - started
+
+
+# -------------------------------------------------------------------
+# Traffic
+# -------------------------------------------------------------------
+CHAMPIONS = ["zoe", "ahri", "jinx", "garen", "lux", "yasuo", "thresh", "ezreal"]
+
+
+def synthetic_event(rng: random.Random, users: int, owners: Dict[str, List[str]],
+                    max_builds: int) -> dict:
+    """
+    One synthetic message. `owners` tracks who holds a build for each champion
+    so adds and deletes balance out and no champion ever has more than
+    `max_builds` rows; otherwise every `!get` would send more as a run goes on.
+    """
+    author = f"user{rng.randrange(users)}"
+    champion = rng.choice(CHAMPIONS)
+    held = owners.setdefault(champion, [])
+    roll = rng.random()
+    if roll < 0.35:
+        content = f"!get {champion}"
+    elif roll < 0.75:
+        if len(held) < max_builds:
+            build = ", ".join(name.lower() for name in rng.sample(ALL_NAMES, 5))
+            content = f"!add {champion} {build}"
+            held.append(author)
+        else:
+            author = rng.choice(held)
+            content = f"!delete {champion}"
+            held[:] = [a for a in held if a != author]
+    elif roll < 0.90:
+        content = "!hello"
+    else:
+        content = "!meme"
+    return {"author": author, "content": content}
+
+
+def synthetic_trace(rate: float, count: int, users: int, seed: int,
+                    poisson: bool = False, max_builds: int = 3) -> List[dict]:
+    rng = random.Random(seed)
+    owners: Dict[str, List[str]] = {}
+    trace, t = [], 0.0
+    for _ in range(count):
+        event = synthetic_event(rng, users, owners, max_builds)
+        event["t"] = round(t, 6)
+        trace.append(event)
+        t += rng.expovariate(rate) if poisson else 1.0 / rate
+    return trace
+
+
+def load_trace(path: str) -> List[dict]:
+    with open(path, encoding="utf-8") as f:
+        trace = [json.loads(line) for line in f if line.strip()]
+    return sorted(trace, key=lambda e: e["t"])
+
+
+def save_trace(path: str, trace: List[dict]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for event in trace:
+            f.write(json.dumps(event) + "\n")
+
+
+# -------------------------------------------------------------------
+# Measurement
+# -------------------------------------------------------------------
+def _memory_probe() -> Optional[Tuple[str, Callable[[], int]]]:
+    """
+    Pick the best process memory figure available on this platform, as
+    (report key, sampler returning bytes). Current RSS comes from /proc;
+    elsewhere only the peak is known, so the key says so. Windows has
+    neither without extra dependencies, so there is no figure at all.
+    """
+    def current_rss() -> int:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    try:
+        current_rss()
+    except (OSError, AttributeError, ValueError):
+        pass
+    else:
+        return "rss_growth_kb", current_rss
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    def peak_rss() -> int:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+    return "rss_peak_growth_kb", peak_rss
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+async def run(gateway: SimulatedGateway, trace: List[dict], speed: float = 1.0,
+              db: Optional[FakeDatabase] = None) -> dict:
+    """
+    Open-loop replay: each event fires at its timestamp whether or not earlier
+    ones finished, and its latency is measured from that timestamp.
+    """
+    latencies: List[float] = []
+    handler_times: List[float] = []
+    failed = errors = 0
+
+    async def one(event: dict, scheduled: float) -> None:
+        nonlocal failed, errors
+        try:
+            latency, handler = await gateway.deliver(
+                event["author"], event["content"], scheduled
+            )
+        except CommandFailed:
+            failed += 1
+        except Exception:
+            errors += 1
+        else:
+            latencies.append(latency)
+            handler_times.append(handler)
+
+    probe = _memory_probe()
+    rss_before = probe[1]() if probe else 0
+    heap_before = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+
+    tasks = []
+    started = time.perf_counter()
+    for event in trace:
+        scheduled = started + event["t"] / speed
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(event, scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    # Let the on_command_error listeners scheduled by the last events run.
+    await asyncio.sleep(0)
+
+    latencies.sort()
+    handler_times.sort()
+    report = {
+        "events": len(trace),
+        "handled": len(latencies),
+        "failed": failed,
+        "errors": errors,
+        "sends": gateway.send_count,
+        "elapsed_s": elapsed,
+        "commands_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+        "handler_p50_ms": _percentile(handler_times, 50) * 1000,
+        "handler_p99_ms": _percentile(handler_times, 99) * 1000,
+    }
+    if probe:
+        key, sample = probe
+        report[key] = (sample() - rss_before) / 1024
+    if gateway.failures:
+        report["failures"] = dict(gateway.failures)
+    if heap_before is not None:
+        current, peak = tracemalloc.get_traced_memory()
+        report["heap_growth_kb"] = (current - heap_before) / 1024
+        report["heap_peak_kb"] = peak / 1024
+    if db is not None:
+        # The stand-in table lives in this process, so its rows are part of
+        # the memory figures above.
+        report["db_rows"] = len(db.rows)
+    return report
+
+
+# -------------------------------------------------------------------
+# Self-check
+# -------------------------------------------------------------------
+SELF_CHECK_TRACE = [
+    {"t": 0.00, "author": "alice", "content": "!add zoe void staff, rabadon's deathcap"},
+    {"t": 0.05, "author": "alice", "content": "!get zoe"},
+    {"t": 0.10, "author": "alice", "content": "!delete zoe"},
+    {"t": 0.15, "author": "alice", "content": "!hello"},
+    {"t": 0.20, "author": "alice", "content": "!nosuch"},
+]
+
+
+def _expect(condition: bool, what: str) -> None:
+    # Not `assert`, so the check still runs under `python -O`.
+    if not condition:
+        raise AssertionError(f"self-check failed: {what}")
+
+
+async def self_check() -> None:
+    """Exercise the stand-ins and a short end-to-end replay against main.bot."""
+    _expect(_percentile([], 99) == 0.0, "percentile of no samples")
+    _expect(_percentile([1.0, 2.0, 3.0, 4.0, 5.0], 50) == 3.0, "median")
+    _expect(_percentile([1.0, 2.0, 3.0, 4.0, 5.0], 100) == 5.0, "max")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trace.jsonl")
+        save_trace(path, list(reversed(SELF_CHECK_TRACE)))
+        _expect(load_trace(path) == SELF_CHECK_TRACE, "trace save/load round trip")
+
+    conn = await FakeDatabase().connect()
+    _expect(await conn.execute(
+        "INSERT INTO builds (champion, item_ids, author) VALUES ($1, $2, $3)",
+        "lux", "3089", "bob",
+    ) == "INSERT 0 1", "fake INSERT")
+    _expect(await conn.fetch(
+        "SELECT item_ids, author FROM builds WHERE champion = $1", "lux",
+    ) == [{"item_ids": "3089", "author": "bob"}], "fake SELECT")
+    _expect(await conn.execute(
+        "DELETE FROM builds WHERE champion = $1 AND author = $2", "lux", "bob",
+    ) == "DELETE 1", "fake DELETE")
+    try:
+        await conn.execute("DROP TABLE builds")
+    except NotImplementedError:
+        pass
+    else:
+        _expect(False, "fake DB rejects unknown SQL")
+
+    db, _ = install_backends(0.0, 0.0)
+    gateway = SimulatedGateway(main.bot)
+    await gateway.start(dispatch_ready=False)
+    report = await run(gateway, SELF_CHECK_TRACE, db=db)
+
+    _expect(report["handled"] == 4, f"4 commands handled, got {report['handled']}")
+    _expect(report["failed"] == 1, f"1 command failed, got {report['failed']}")
+    _expect(report["errors"] == 0, f"no harness errors, got {report['errors']}")
+    _expect(report.get("failures") == {"CommandNotFound": 1}, "failure tally")
+    _expect(report["sends"] == 4, f"4 replies captured, got {report['sends']}")
+    replies = [content for _, content in gateway.sent]
+    _expect(len(replies) == 4, f"4 replies kept in gateway.sent, got {len(replies)}")
+    _expect(replies[0] == "✅ Build for **Zoe** saved with 2 items!", "!add reply")
+    _expect("Build for Zoe" in replies[1] and "/3135.png" in replies[1]
+            and "/3089.png" in replies[1], "!get reply")
+    _expect(replies[2].startswith("🗑️ Deleted 1 build(s)"), "!delete reply")
+    _expect(replies[3].startswith("Hey"), "!hello reply")
+    _expect(db.rows == [], "build deleted from the fake DB")
+
+
+# -------------------------------------------------------------------
+# Entry point
+# -------------------------------------------------------------------
+def install_backends(db_latency: float, http_latency: float):
+    """Point main.py's asyncpg/aiohttp names at the in-memory stand-ins."""
+    db = FakeDatabase(latency=db_latency)
+    http = FakeHTTP(latency=http_latency)
+    main.asyncpg = SimpleNamespace(connect=db.connect)
+    main.aiohttp = SimpleNamespace(ClientSession=http.ClientSession)
+    return db, http
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline load test for BuildBot.")
+    parser.add_argument("--rate", type=float, default=100.0, help="messages per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of synthetic traffic")
+    parser.add_argument("--count", type=int, help="number of messages (overrides --duration)")
+    parser.add_argument("--users", type=int, default=50, help="distinct synthetic authors")
+    parser.add_argument("--max-builds", type=int, default=3,
+                        help="synthetic traffic keeps at most this many builds per champion")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--poisson", action="store_true", help="exponential inter-arrival times")
+    parser.add_argument("--replay", metavar="PATH", help="replay a recorded trace instead")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier")
+    parser.add_argument("--record", metavar="PATH", help="write the traffic that was sent to PATH")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="simulated DB round trip (s)")
+    parser.add_argument("--http-latency", type=float, default=0.0, help="simulated Reddit latency (s)")
+    parser.add_argument("--tracemalloc", action="store_true", help="also report Python heap growth")
+    parser.add_argument("--self-check", action="store_true",
+                        help="run a short fixed replay and verify the harness, then exit")
+    parser.add_argument("--show-sends", type=int, default=0, metavar="N",
+                        help="print the last N captured bot replies")
+    return parser.parse_args(argv)
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    if args.replay:
+        trace = load_trace(args.replay)
+    else:
+        count = args.count or max(1, int(args.rate * args.duration))
+        trace = synthetic_trace(args.rate, count, args.users, args.seed, args.poisson,
+                                args.max_builds)
+    if args.record:
+        save_trace(args.record, trace)
+
+    db, _ = install_backends(args.db_latency, args.http_latency)
+    gateway = SimulatedGateway(main.bot)
+    await gateway.start()
+    if args.tracemalloc:
+        tracemalloc.start()
+    report = await run(gateway, trace, speed=args.speed, db=db)
+    if args.show_sends:
+        for channel_id, content in list(gateway.sent)[-args.show_sends:]:
+            print(f"[{channel_id}] {content}")
+    return report
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.self_check:
+        asyncio.run(self_check())
+        print("self-check passed")
+        sys.exit(0)
+    report = asyncio.run(_main(args))
+    for key, value in report.items():
+        print(f"{key:>16}: {value:.2f}" if isinstance(value, float) else f"{key:>16}: {value}")
+    print("(memory figures include the in-process stand-in DB, see db_rows)")